@@ -3,14 +3,16 @@ from tkinter import filedialog, messagebox
 from PIL import Image, ImageTk
 import cv2
 from ultralytics import YOLO
+from signature_gate import may_contain_signature, load_gate_threshold, describe_gate, DEFAULT_GATE_THRESHOLD
 
 # Step 1: Initialize variables
 model = None
 model_path = ""
+gate_threshold = DEFAULT_GATE_THRESHOLD  # Loaded with the model from its calibration file (0 disables the gate)
 
 # Step 2: Function to load the YOLOv8 model
 def select_model():
-    global model, model_path
+    global model, model_path, gate_threshold
 
     # Bring the main window to the front
     root.lift()
@@ -30,14 +32,17 @@ def select_model():
         return  # User canceled the file dialog
 
     try:
-        # Load the selected model
-        model = YOLO(file_path)
-        model_path = file_path
+        # Load the selected model and its gate threshold (written by benchmark_gate.py),
+        # and only replace the current ones once both have loaded
+        new_model = YOLO(file_path)
+        new_gate_threshold = load_gate_threshold(file_path)
+        model, model_path, gate_threshold = new_model, file_path, new_gate_threshold
+        gate_status = describe_gate(file_path, gate_threshold)
 
         # Show success message box and ensure it stays on top
         root.lift()
         root.attributes('-topmost', True)
-        messagebox.showinfo("Success", f"Model loaded successfully: {file_path}")
+        messagebox.showinfo("Success", f"Model loaded successfully: {file_path}\n{gate_status}")
         root.attributes('-topmost', False)
     except Exception as e:
         # Show error message box and ensure it stays on top
@@ -58,6 +63,16 @@ def detect_objects(image_path):
         if image is None:
             raise ValueError("Unable to load the image. Please check the file path.")
 
+        # Skip the full detector on pages that clearly hold no signature
+        if not may_contain_signature(image, gate_threshold):
+            # Tell the user the model did not run, so this is not mistaken for "nothing found"
+            root.lift()
+            root.attributes('-topmost', True)
+            messagebox.showinfo("Skipped", "The signature gate found too little ink on this image, "
+                                           "so the detector was not run.")
+            root.attributes('-topmost', False)
+            return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
         # Perform inference
         results = model(image)
 
@@ -0,0 +1,194 @@
+import os
+import time
+import random
+import cv2
+from tkinter import Tk, filedialog
+from ultralytics import YOLO
+from signature_gate import ink_score, calibrate_threshold, save_gate_threshold
+
+# Measure what the ink-density gate in signature_gate.py buys us on a held-out set.
+# The set is a YOLO-style images/labels folder pair: an image counts as signed when its
+# label file has at least one box, and as unsigned when the label file is missing or empty.
+# Half of the images calibrate the gate threshold for the requested recall target,
+# the other half measure throughput and recall with and without the gate. If the user
+# accepts the result, the threshold is saved next to the model so app.py and
+# document_pipeline.py use it.
+
+IMAGE_SIZE = 640  # YOLO inference size (same as training)
+CONFIDENCE = 0.25  # Minimum confidence for a box to count as a signature
+CALIBRATION_RATIO = 0.5  # Share of the held-out images used to calibrate the gate
+SEED = 0  # Fixed seed so the calibration/evaluation split is repeatable
+
+
+# Step 1: Use tkinter to let the user select the model and the held-out folders
+def select_file(title, filetypes):
+    """Open a dialog to select a single file."""
+    root = Tk()
+    root.withdraw()  # Hide the main tkinter window
+    root.lift()
+    root.attributes('-topmost', True)  # Ensure the dialog is on top
+    file_path = filedialog.askopenfilename(title=title, filetypes=filetypes)
+    root.destroy()
+    return file_path
+
+
+def select_directory(title):
+    """Open a dialog to select a directory."""
+    root = Tk()
+    root.withdraw()
+    root.lift()
+    root.attributes('-topmost', True)
+    directory = filedialog.askdirectory(title=title)
+    root.destroy()
+    return directory
+
+
+# Step 2: Collect the held-out images and whether each one holds a signature
+def load_held_out_set(images_dir, labels_dir):
+    samples = []
+    for image_file in sorted(os.listdir(images_dir)):
+        if not image_file.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')):
+            continue
+        label_path = os.path.join(labels_dir, os.path.splitext(image_file)[0] + ".txt")
+        has_signature = False
+        if os.path.exists(label_path):
+            with open(label_path, "r") as f:
+                has_signature = any(len(line.split()) >= 5 for line in f)
+        samples.append((os.path.join(images_dir, image_file), has_signature))
+    return samples
+
+
+def split_samples(samples):
+    shuffled = list(samples)
+    random.Random(SEED).shuffle(shuffled)
+    split_index = int(len(shuffled) * CALIBRATION_RATIO)
+    return shuffled[:split_index], shuffled[split_index:]
+
+
+# Step 3: Calibrate the gate on the signed images of the calibration split
+def calibrate(calibration_samples, recall_target):
+    positive_scores = []
+    for image_path, has_signature in calibration_samples:
+        if not has_signature:
+            continue
+        image = cv2.imread(image_path)
+        if image is None:
+            continue
+        positive_scores.append(ink_score(image))
+    return calibrate_threshold(positive_scores, recall_target)
+
+
+# Step 4: Time the gate and the detector on every evaluation image
+def evaluate(model, evaluation_samples, threshold):
+    records = []
+    for image_path, has_signature in evaluation_samples:
+        image = cv2.imread(image_path)  # Decoding is the same with or without the gate, so it is not timed
+        if image is None:
+            print(f"Warning: Could not load {image_path}. Skipping...")
+            continue
+
+        start = time.perf_counter()
+        score = ink_score(image)
+        gate_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = model(image, imgsz=IMAGE_SIZE, conf=CONFIDENCE, verbose=False)
+        detector_time = time.perf_counter() - start
+
+        records.append({
+            "has_signature": has_signature,
+            "detected": any(len(result.boxes) > 0 for result in results),
+            "passed_gate": score >= threshold,
+            "gate_time": gate_time,
+            "detector_time": detector_time,
+        })
+    return records
+
+
+def recall(records, detected_key):
+    positives = [r for r in records if r["has_signature"]]
+    if not positives:
+        return float("nan")
+    return sum(1 for r in positives if detected_key(r)) / len(positives)
+
+
+# Step 5: Print the comparison
+def report(records, threshold, recall_target):
+    pages = len(records)
+    baseline_time = sum(r["detector_time"] for r in records)
+    gated_time = sum(r["gate_time"] + (r["detector_time"] if r["passed_gate"] else 0.0) for r in records)
+    skipped = sum(1 for r in records if not r["passed_gate"])
+    lost = sum(1 for r in records if r["has_signature"] and r["detected"] and not r["passed_gate"])
+
+    baseline_recall = recall(records, lambda r: r["detected"])
+    gated_recall = recall(records, lambda r: r["detected"] and r["passed_gate"])
+    gate_recall = recall(records, lambda r: r["passed_gate"])
+
+    print("\n===== Signature gate benchmark =====")
+    print(f"Recall target: {recall_target:.3f}  ->  gate threshold: {threshold:.4f}")
+    print(f"Evaluation pages: {pages} ({sum(1 for r in records if r['has_signature'])} with a signature)")
+    print(f"Pages skipped by the gate: {skipped} ({skipped / pages:.1%})")
+    print(f"Detector only:   {pages / baseline_time:.2f} pages/s")
+    print(f"Gate + detector: {pages / gated_time:.2f} pages/s  (speed-up x{baseline_time / gated_time:.2f})")
+    print(f"Mean gate cost: {1000 * sum(r['gate_time'] for r in records) / pages:.2f} ms/page")
+    print(f"Gate recall (signed pages let through): {gate_recall:.3f}")
+    print(f"Detector recall without gate: {baseline_recall:.3f}")
+    print(f"Detector recall with gate:    {gated_recall:.3f}  (loss {baseline_recall - gated_recall:.3f})")
+    print(f"Detector hits dropped by the gate: {lost}")
+    print("Note: the gate measures ink amount only, so it skips blank pages but not unsigned text pages.")
+
+
+# Main function to handle user interaction
+def main():
+    model_path = select_file("Select Model File", [("Model Files", "*.pt"), ("All Files", "*.*")])
+    if not model_path:
+        print("No model selected. Exiting...")
+        return
+
+    images_dir = select_directory("Select Held-out IMAGES Folder")
+    labels_dir = select_directory("Select Held-out LABELS Folder")
+    if not images_dir or not labels_dir:
+        print("No held-out folders selected. Exiting...")
+        return
+
+    try:
+        recall_target = float(input("Enter the gate recall target (e.g., 0.99): "))
+    except ValueError:
+        print("Invalid recall target. It must be a number. Exiting.")
+        return
+
+    samples = load_held_out_set(images_dir, labels_dir)
+    calibration_samples, evaluation_samples = split_samples(samples)
+    if not evaluation_samples:
+        print("Not enough held-out images to benchmark. Exiting.")
+        return
+
+    try:
+        threshold = calibrate(calibration_samples, recall_target)
+    except ValueError as e:
+        print(f"Could not calibrate the gate: {e}")
+        return
+
+    model = YOLO(model_path)
+    # Warm up so model loading and first-call overhead are not counted
+    warmup_image = cv2.imread(evaluation_samples[0][0])
+    if warmup_image is not None:
+        model(warmup_image, imgsz=IMAGE_SIZE, verbose=False)
+
+    records = evaluate(model, evaluation_samples, threshold)
+    if not records:
+        print("No evaluation images could be loaded. Exiting.")
+        return
+    report(records, threshold, recall_target)
+
+    # Only turn the gate on for app.py and document_pipeline.py once the user accepts the numbers
+    answer = input(f"\nSave gate threshold {threshold:.4f} for this model? [y/N]: ")
+    if answer.strip().lower() in ('y', 'yes'):
+        config_path = save_gate_threshold(model_path, threshold, recall_target)
+        print(f"Gate threshold saved to: {config_path}")
+    else:
+        print("Gate threshold not saved.")
+
+
+if __name__ == "__main__":
+    main()
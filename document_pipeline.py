@@ -0,0 +1,361 @@
+import os
+import csv
+import queue
+import threading
+import cv2
+import numpy as np
+from PIL import Image, ImageSequence
+from tkinter import Tk, filedialog
+from ultralytics import YOLO
+from signature_gate import may_contain_signature, load_gate_threshold, describe_gate, DEFAULT_GATE_THRESHOLD
+
+# Step 1: Pipeline settings
+PDF_DPI = 150  # Resolution used when rasterising PDF pages
+MAX_SIDE = 1280  # Longest page side after resizing (keeps every page the same memory size)
+BATCH_SIZE = 4  # Number of pages sent to YOLO in one forward pass
+IMAGE_SIZE = 640  # YOLO inference size (same as training)
+CONFIDENCE = 0.25  # Minimum confidence for a box to count as a signature
+QUEUE_SIZE = 8  # Maximum pages waiting between two stages
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+TIFF_EXTENSIONS = ('.tif', '.tiff')
+
+_DONE = object()  # Marker sent down the queues when a stage has finished
+
+
+# Step 2: Use tkinter to let the user select the model, document and output folder
+def select_file(title, filetypes):
+    """Open a dialog to select a single file."""
+    root = Tk()
+    root.withdraw()  # Hide the main tkinter window
+    root.lift()  # Bring the root window to the front
+    root.attributes('-topmost', True)  # Ensure the dialog is on top
+    file_path = filedialog.askopenfilename(title=title, filetypes=filetypes)
+    root.destroy()  # Destroy the hidden root window after selection
+    return file_path
+
+
+def select_output_directory():
+    """Open a dialog to select the folder where results are written."""
+    root = Tk()
+    root.withdraw()  # Hide the main tkinter window
+    root.lift()
+    root.attributes('-topmost', True)
+    output_dir = filedialog.askdirectory(title="Select Output Directory")
+    root.destroy()
+    return output_dir
+
+
+# Step 3: Page sources - each yields one page at a time so only that page is in memory
+def import_fitz():
+    """Import PyMuPDF, which is only needed for PDF input."""
+    try:
+        import fitz
+    except ImportError:
+        raise ImportError("PDF input needs PyMuPDF. Install it with 'pip install PyMuPDF'.")
+    return fitz
+
+
+def iter_pdf_pages(document_path):
+    """Yield every page of a PDF as an RGB numpy array."""
+    fitz = import_fitz()
+    zoom = PDF_DPI / 72.0
+    with fitz.open(document_path) as document:
+        for page in document:
+            pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csRGB, alpha=False)
+            page_image = np.frombuffer(pixmap.samples, dtype=np.uint8)
+            page_image = page_image.reshape(pixmap.height, pixmap.width, 3).copy()
+            del pixmap
+            yield page_image
+
+
+def iter_tiff_pages(document_path):
+    """Yield every frame of a (multi-page) TIFF as an RGB numpy array."""
+    with Image.open(document_path) as tiff:
+        for frame in ImageSequence.Iterator(tiff):
+            yield np.array(frame.convert("RGB"))
+
+
+def iter_image_pages(document_path):
+    """Treat a single image file as a one-page document."""
+    image = cv2.imread(document_path)
+    if image is None:
+        raise ValueError(f"Unable to load the image: {document_path}")
+    yield cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+
+def check_document(document_path):
+    """Raise before any work starts if the document cannot be read at all."""
+    if not os.path.isfile(document_path):
+        raise ValueError(f"Document not found: {document_path}")
+    extension = os.path.splitext(document_path)[1].lower()
+    if extension == '.pdf':
+        import_fitz()
+    elif extension not in TIFF_EXTENSIONS + IMAGE_EXTENSIONS:
+        raise ValueError(f"Unsupported document type: {extension}")
+
+
+def iter_pages(document_path):
+    """Pick the page source that matches the document type."""
+    extension = os.path.splitext(document_path)[1].lower()
+    if extension == '.pdf':
+        return iter_pdf_pages(document_path)
+    if extension in TIFF_EXTENSIONS:
+        return iter_tiff_pages(document_path)
+    if extension in IMAGE_EXTENSIONS:
+        return iter_image_pages(document_path)
+    raise ValueError(f"Unsupported document type: {extension}")
+
+
+# Step 4: Resize a BGR page so that its longest side is at most MAX_SIDE
+def prepare_page(image):
+    height, width = image.shape[:2]
+    scale = MAX_SIDE / max(height, width)
+    if scale < 1:
+        image = cv2.resize(image, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+    return image
+
+
+# Step 5: Draw the detected boxes on a page (same look as app.py)
+def draw_boxes(image, detections, names):
+    for (x1, y1, x2, y2), score, class_id in detections:
+        label = f"{names[class_id]} {score:.2f}"
+        color = (0, 255, 0)  # Green bounding box
+        cv2.rectangle(image, (x1, y1), (x2, y2), color, 2)
+        cv2.putText(image, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.9, color, 2)
+    return image
+
+
+# Step 6: The streaming pipeline
+class DocumentPipeline:
+    """Run rasterise -> resize -> batched YOLO -> write as four stages joined by bounded queues.
+
+    Every stage runs in its own thread, so reading the next pages and writing
+    the previous results overlap with inference. Because the queues are bounded,
+    a slow stage blocks the ones before it and memory use stays the same no
+    matter how many pages the document has.
+    """
+
+    def __init__(self, model, batch_size=BATCH_SIZE, queue_size=QUEUE_SIZE, confidence=CONFIDENCE,
+                 gate_threshold=DEFAULT_GATE_THRESHOLD):
+        self.model = model
+        self.gate_threshold = gate_threshold  # Pages scoring below this skip YOLO (0 disables the gate)
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.confidence = confidence
+        self.errors = []
+        self._stop = threading.Event()
+
+    def _put(self, target_queue, item):
+        # Block until there is room, but give up if another stage has failed
+        while not self._stop.is_set():
+            try:
+                target_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source_queue):
+        while not self._stop.is_set():
+            try:
+                return source_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _run_stage(self, work, output_queue):
+        # Record any error, stop the other stages and always signal the end downstream
+        try:
+            work()
+        except Exception as e:
+            self.errors.append(e)
+            self._stop.set()
+        finally:
+            if output_queue is not None:
+                self._put(output_queue, _DONE)
+
+    def _rasterise(self, document_path, page_queue):
+        for page_number, page_rgb in enumerate(iter_pages(document_path), start=1):
+            if not self._put(page_queue, (page_number, page_rgb)):
+                return
+
+    def _decode(self, page_queue, frame_queue):
+        while True:
+            item = self._get(page_queue)
+            if item is _DONE:
+                return
+            page_number, page_rgb = item
+            page_bgr = cv2.cvtColor(page_rgb, cv2.COLOR_RGB2BGR)
+            # The gate scores the full-resolution page, the same input benchmark_gate.py
+            # calibrates on, before the page is shrunk for YOLO
+            gated = not may_contain_signature(page_bgr, self.gate_threshold)
+            if not self._put(frame_queue, (page_number, prepare_page(page_bgr), gated)):
+                return
+
+    def _infer(self, frame_queue, result_queue):
+        # Pages since the last YOLO call, in page order. Only pages that pass the gate
+        # count towards batch_size; gated pages wait here so results keep page order.
+        pending = []
+        while True:
+            item = self._get(frame_queue)
+            if item is not _DONE:
+                pending.append(item)
+            to_detect = sum(1 for _, _, gated in pending if not gated)
+            flush = (
+                item is _DONE
+                or to_detect == 0  # Only gated pages: nothing to wait for
+                or to_detect == self.batch_size
+                or len(pending) - to_detect >= self.queue_size  # Keep memory bounded on long blank runs
+            )
+            if pending and flush:
+                if not self._infer_batch(pending, result_queue):
+                    return
+                pending = []
+            if item is _DONE:
+                return
+
+    def _infer_batch(self, batch, result_queue):
+        images = [image for _, image, gated in batch if not gated]
+        results = iter([])
+        if images:
+            results = iter(self.model(images, imgsz=IMAGE_SIZE, conf=self.confidence, verbose=False))
+        for page_number, image, gated in batch:
+            if gated:
+                if not self._put(result_queue, (page_number, image, [], True)):
+                    return False
+                continue
+
+            result = next(results)
+            boxes = result.boxes.xyxy.cpu().numpy()  # Bounding box coordinates
+            scores = result.boxes.conf.cpu().numpy()  # Confidence scores
+            class_ids = result.boxes.cls.cpu().numpy()  # Class IDs
+            detections = [
+                (tuple(map(int, box)), float(score), int(class_id))
+                for box, score, class_id in zip(boxes, scores, class_ids)
+            ]
+            if not self._put(result_queue, (page_number, image, detections, False)):
+                return False
+        return True
+
+    def _write(self, result_queue, csv_path, document_name, output_folder, on_page):
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["page", "signature", "gated", "detections", "best_label", "best_confidence"])
+            while True:
+                item = self._get(result_queue)
+                if item is _DONE:
+                    break
+                page_number, image, detections, gated = item
+                verdict = {
+                    "page": page_number,
+                    "signature": bool(detections),
+                    "gated": gated,  # True when the gate skipped YOLO for this page
+                    "detections": len(detections),
+                    "best_label": "",
+                    "best_confidence": 0.0,
+                }
+                if detections:
+                    _, best_score, best_class = max(detections, key=lambda d: d[1])
+                    verdict["best_label"] = self.model.names[best_class]
+                    verdict["best_confidence"] = round(best_score, 4)
+
+                    # Only pages with a signature are saved as annotated images
+                    annotated = draw_boxes(image, detections, self.model.names)
+                    page_file = f"{document_name}_page_{page_number:04d}.jpg"
+                    cv2.imwrite(os.path.join(output_folder, page_file), annotated)
+
+                writer.writerow([verdict[key] for key in
+                                 ("page", "signature", "gated", "detections", "best_label", "best_confidence")])
+                f.flush()
+                if on_page is not None:
+                    on_page(verdict)
+
+    def run(self, document_path, output_folder, on_page=None):
+        """Process one document and return the path of the per-page CSV report.
+
+        ``on_page`` is called with the verdict dict of every page as soon as it is written.
+        """
+        check_document(document_path)
+        os.makedirs(output_folder, exist_ok=True)
+        document_name = os.path.splitext(os.path.basename(document_path))[0]
+        csv_path = os.path.join(output_folder, f"{document_name}_signatures.csv")
+        # The report is written under a temporary name and only renamed once every page succeeded
+        partial_path = csv_path + ".part"
+
+        self.errors = []
+        self._stop.clear()
+        page_queue = queue.Queue(maxsize=self.queue_size)
+        frame_queue = queue.Queue(maxsize=self.queue_size)
+        result_queue = queue.Queue(maxsize=self.queue_size)
+
+        stages = [
+            threading.Thread(target=self._run_stage, daemon=True,
+                             args=(lambda: self._rasterise(document_path, page_queue), page_queue)),
+            threading.Thread(target=self._run_stage, daemon=True,
+                             args=(lambda: self._decode(page_queue, frame_queue), frame_queue)),
+            threading.Thread(target=self._run_stage, daemon=True,
+                             args=(lambda: self._infer(frame_queue, result_queue), result_queue)),
+        ]
+        for stage in stages:
+            stage.start()
+
+        # The writer runs in the calling thread so the report is complete when run() returns
+        self._run_stage(lambda: self._write(result_queue, partial_path, document_name, output_folder, on_page),
+                        None)
+        self._stop.set()
+        for stage in stages:
+            stage.join()
+
+        if self.errors:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise self.errors[0]
+        os.replace(partial_path, csv_path)
+        return csv_path
+
+
+# Step 7: Main function to handle user interaction
+def main():
+    model_path = select_file("Select Model File", [("Model Files", "*.pt"), ("All Files", "*.*")])
+    if not model_path:
+        print("No model selected. Exiting...")
+        return
+
+    document_path = select_file(
+        "Select Document",
+        [("Documents", "*.pdf *.tif *.tiff *.jpg *.jpeg *.png *.bmp"), ("All Files", "*.*")]
+    )
+    if not document_path:
+        print("No document selected. Exiting...")
+        return
+
+    output_folder = select_output_directory()
+    if not output_folder:
+        print("No output directory selected. Exiting...")
+        return
+
+    print(f"Loading model: {model_path}")
+    model = YOLO(model_path)
+    gate_threshold = load_gate_threshold(model_path)  # Written by benchmark_gate.py
+    print(describe_gate(model_path, gate_threshold))
+    pipeline = DocumentPipeline(model, gate_threshold=gate_threshold)
+
+    signed_pages = []
+
+    def report(verdict):
+        if verdict["gated"]:
+            status = "no signature (skipped by the gate)"
+        else:
+            status = "signature" if verdict["signature"] else "no signature"
+        print(f"Page {verdict['page']}: {status}")
+        if verdict["signature"]:
+            signed_pages.append(verdict["page"])
+
+    csv_path = pipeline.run(document_path, output_folder, on_page=report)
+    print(f"\nPages with a signature: {signed_pages if signed_pages else 'none'}")
+    print(f"Per-page results saved to: {csv_path}")
+
+
+if __name__ == "__main__":
+    main()
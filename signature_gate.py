@@ -0,0 +1,109 @@
+import os
+import json
+import cv2
+import numpy as np
+
+# Cheap signature / no-signature gate that runs before the full YOLOv8 forward pass.
+# It uses the same grayscale + threshold steps as colour-step-1.py to measure how
+# much ink a page holds. A page whose densest region is (almost) blank cannot hold
+# a signature, so the detector can be skipped for it.
+#
+# Limitation: the score only measures how much ink there is, not what kind. A page of
+# typed text has dense tiles just like a signed page, so the gate can only skip blank
+# or nearly blank pages (separator sheets, empty backs of scans). Unsigned text pages
+# still go to YOLO, and the throughput gain depends on how many blank pages the input has.
+
+GATE_WIDTH = 256  # Pages are shrunk to this width before scoring (keeps the gate cheap)
+GRID_SIZE = 8  # The page is split into GRID_SIZE x GRID_SIZE tiles
+INK_THRESHOLD = 128  # Same binary threshold as apply_black_and_white in colour-step-1.py
+DEFAULT_GATE_THRESHOLD = 0.0  # Gate is off (every page goes to YOLO) until a model has been calibrated
+
+
+# Function to convert a BGR page to grayscale (as apply_grayscale in colour-step-1.py)
+def apply_grayscale(image):
+    if image.ndim == 2:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+# Function to build the ink mask (inverted black-and-white, ink = 255)
+def ink_mask(image):
+    # Threshold at full resolution first: shrinking the grayscale page would blur
+    # thin pen strokes to light gray and they would no longer count as ink
+    gray = apply_grayscale(image)
+    _, mask = cv2.threshold(gray, INK_THRESHOLD, 255, cv2.THRESH_BINARY_INV)
+
+    # Shrinking the binary mask with INTER_AREA keeps the ink fraction of every area
+    height, width = mask.shape[:2]
+    if width > GATE_WIDTH:
+        mask = cv2.resize(mask, (GATE_WIDTH, max(1, int(height * GATE_WIDTH / width))),
+                          interpolation=cv2.INTER_AREA)
+    return mask
+
+
+def ink_score(image):
+    """Return the ink density of the densest tile of the page, between 0 and 1."""
+    mask = ink_mask(image)
+    height, width = mask.shape[:2]
+    rows = min(GRID_SIZE, height)
+    cols = min(GRID_SIZE, width)
+
+    # Crop so the mask splits evenly into tiles, then average each tile
+    mask = mask[:height - height % rows, :width - width % cols]
+    tiles = mask.reshape(rows, mask.shape[0] // rows, cols, mask.shape[1] // cols)
+    densities = tiles.mean(axis=(1, 3)) / 255.0
+    return float(densities.max())
+
+
+def may_contain_signature(image, threshold=DEFAULT_GATE_THRESHOLD):
+    """Return True if the page should be sent to the detector."""
+    if threshold <= 0:
+        return True  # Gate is off: skip the scoring work entirely
+    return ink_score(image) >= threshold
+
+
+def calibrate_threshold(positive_scores, recall_target=0.99):
+    """Pick the highest gate threshold that still lets ``recall_target`` of the signed pages through.
+
+    ``positive_scores`` are the ink scores of held-out pages known to contain a signature.
+    """
+    if not 0 < recall_target <= 1:
+        raise ValueError("recall_target must be between 0 and 1.")
+    if len(positive_scores) == 0:
+        raise ValueError("At least one page with a signature is needed to calibrate the gate.")
+
+    scores = np.sort(np.asarray(positive_scores, dtype=float))
+    # Number of signed pages we are allowed to lose at this recall target
+    allowed_misses = int(np.floor(len(scores) * (1 - recall_target) + 1e-9))
+    return float(scores[allowed_misses])
+
+
+# The calibrated threshold is stored next to the model it was measured with,
+# e.g. best.pt -> best_gate.json, so app.py and document_pipeline.py can pick it up
+def gate_config_path(model_path):
+    return os.path.splitext(model_path)[0] + "_gate.json"
+
+
+def save_gate_threshold(model_path, threshold, recall_target):
+    config_path = gate_config_path(model_path)
+    with open(config_path, "w") as f:
+        json.dump({"threshold": threshold, "recall_target": recall_target}, f, indent=2)
+    return config_path
+
+
+def load_gate_threshold(model_path):
+    """Return the calibrated threshold for ``model_path``, or DEFAULT_GATE_THRESHOLD (gate off) if there is none."""
+    config_path = gate_config_path(model_path)
+    if not os.path.exists(config_path):
+        return DEFAULT_GATE_THRESHOLD
+    with open(config_path, "r") as f:
+        return float(json.load(f)["threshold"])
+
+
+def describe_gate(model_path, threshold):
+    """Return a one-line status of the gate loaded for ``model_path``."""
+    if not os.path.exists(gate_config_path(model_path)):
+        return "Signature gate off (no calibration file found next to the model)"
+    if threshold <= 0:
+        return "Signature gate off (calibrated threshold is 0)"
+    return f"Signature gate on (threshold {threshold:.4f})"